@@ -1,23 +1,41 @@
 import asyncio
+import hashlib
+import json
 import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from functools import lru_cache
 from textwrap import dedent
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from dotenv import load_dotenv  # Added for .env support
 
+import httpx
+from anthropic import APIConnectionError, AsyncAnthropic, RateLimitError
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+
 from agno.agent import Agent
+from agno.exceptions import ModelProviderError
 from agno.models.anthropic.claude import Claude
-from agno.team import Team
+from agno.tools import Toolkit
 from agno.tools.duckduckgo import DuckDuckGoTools
-from agno.tools.exa import ExaTools
-from agno.tools.mcp import MCPTools
-from mcp import StdioServerParameters
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
+
+try:  # Optional: match paraphrased prompts in the response cache
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
 
-# Load environment variables from .env file
+# Load environment variables from .env file before any setting below is read
 load_dotenv()
 
 # Define response models
 class MarketAnalysis(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     market_size: str = Field(description="Estimated market size in dollars")
     growth_rate: str = Field(description="Annual growth rate of the market")
     key_trends: List[str] = Field(description="Major trends affecting the market")
@@ -27,6 +45,8 @@ class MarketAnalysis(BaseModel):
 
 
 class CompetitorInfo(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     name: str
     description: str
     strengths: List[str]
@@ -38,6 +58,8 @@ class CompetitorInfo(BaseModel):
 
 
 class BusinessModel(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     name: str = Field(description="Name or type of the business model")
     description: str = Field(description="Description of how the model works")
     revenue_streams: List[str] = Field(description="Ways the business will make money")
@@ -50,6 +72,8 @@ class BusinessModel(BaseModel):
 
 
 class FinancialProjection(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     startup_costs: Dict[str, str] = Field(description="Initial costs to start the business")
     monthly_operating_costs: Dict[str, str] = Field(description="Recurring monthly expenses")
     revenue_projections: Dict[str, str] = Field(description="Estimated revenue for different timeframes")
@@ -59,6 +83,8 @@ class FinancialProjection(BaseModel):
 
 
 class StartupPlan(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     business_name: Optional[str] = None
     industry: str
     market_analysis: MarketAnalysis
@@ -69,17 +95,539 @@ class StartupPlan(BaseModel):
     resources: Optional[List[str]] = None
 
 
-async def run_team():
-    # Get API keys from environment (loaded from .env file)
-    anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
-    exa_api_key = os.getenv("EXA_API_KEY")
-    
-    if not anthropic_api_key:
-        raise ValueError("ANTHROPIC_API_KEY is not set in the .env file")
-    
-    # Define each agent's tools
+# Define agent instructions and the business idea once, so prompts are byte-identical across runs
+MARKET_RESEARCH_INSTRUCTIONS = dedent("""\
+    You are a market research specialist. Your role is to:
+    1. Analyze market size, growth trends, and opportunities for new businesses
+    2. Identify key demographics and customer segments
+    3. Determine market needs and gaps that could be addressed
+    4. Assess barriers to entry and market challenges
+    5. Identify current market trends and future projections
+
+    Provide comprehensive research about the specified industry or business idea.
+    Always include specific data points and statistics when available.\
+""")
+
+COMPETITOR_ANALYSIS_INSTRUCTIONS = dedent("""\
+    You are a competitive intelligence analyst. Your role is to:
+    1. Identify major competitors in the specified market
+    2. Analyze their strengths and weaknesses
+    3. Examine their pricing strategies and market positioning
+    4. Identify their unique selling propositions
+    5. Find potential gaps or weaknesses that a new business could exploit
+
+    Provide detailed analysis of at least 3-5 key competitors in the space.
+    Include specific examples of their strategies and market positions.\
+""")
+
+BUSINESS_MODEL_INSTRUCTIONS = dedent("""\
+    You are a business model strategist. Your role is to:
+    1. Recommend appropriate business models for the proposed venture
+    2. Analyze revenue streams and cost structures
+    3. Define value propositions that would resonate with target customers
+    4. Identify key resources, activities, and partnerships needed
+    5. Evaluate scalability and growth potential
+
+    Suggest at least 2-3 viable business models for the proposed business.
+    Be specific about how each model would work in practice.\
+""")
+
+FINANCIAL_ANALYSIS_INSTRUCTIONS = dedent("""\
+    You are a financial analyst specializing in startups. Your role is to:
+    1. Estimate startup costs and initial capital requirements
+    2. Project monthly operating expenses
+    3. Create revenue projections for the first 1-3 years
+    4. Perform break-even analysis
+    5. Suggest funding options and investment requirements
+
+    Provide realistic financial projections based on the industry and business model.
+    Include specific costs and revenue figures whenever possible.\
+""")
+
+LEGAL_COMPLIANCE_INSTRUCTIONS = dedent("""\
+    You are a legal and regulatory advisor for startups. Your role is to:
+    1. Identify key legal requirements for business formation
+    2. Outline necessary licenses and permits
+    3. Highlight industry-specific regulations
+    4. Advise on intellectual property protection
+    5. Point out potential legal risks and compliance issues
+
+    Provide general legal guidance for the proposed business.
+    Note that your advice is informational and entrepreneurs should 
+    consult with a qualified attorney for specific legal questions.\
+""")
+
+# Upstream agents open with a summary so dependent agents can start before the report ends
+SUMMARY_MARKER = "=== END OF SUMMARY ==="
+SUMMARY_INSTRUCTIONS = dedent(f"""\
+    Begin your report with a short summary of your key findings and figures.
+    End the summary with a line containing only {SUMMARY_MARKER}
+    and then continue with the detailed report.\
+""")
+
+# Content events are "RunResponse" up to agno 1.5 and "RunResponseContent" from 1.6
+CONTENT_EVENTS = {"RunResponse", "RunResponseContent"}
+
+SYNTHESIS_INSTRUCTIONS = dedent("""\
+    You are a business startup advisor leading a team of specialists.
+    First, understand the business idea and industry thoroughly.
+    The reports of all specialists are included below the business idea.
+    Synthesize all information into a comprehensive startup plan with specific, actionable advice.\
+""")
+
+BUSINESS_IDEA = dedent("""\
+    I'm thinking of starting a subscription-based meal preparation service that 
+    focuses on sustainable, locally-sourced ingredients and targets busy professionals.
+    The service would deliver pre-portioned ingredients and recipes weekly.
+    I'm planning to launch in Austin, Texas first, then expand to other cities.
+    What should I know before starting this business? What are my chances of success?
+    """)
+# ADVISOR_MODE=single has one Claude conversation act as every specialist at once
+SINGLE_CALL_INSTRUCTIONS = "\n\n".join([
+    "You combine the expertise of the following specialists and research the business idea on their behalf.",
+    MARKET_RESEARCH_INSTRUCTIONS,
+    COMPETITOR_ANALYSIS_INSTRUCTIONS,
+    BUSINESS_MODEL_INSTRUCTIONS,
+    FINANCIAL_ANALYSIS_INSTRUCTIONS,
+    LEGAL_COMPLIANCE_INSTRUCTIONS,
+    "Use the search tools as needed, then submit a comprehensive startup plan with specific, actionable advice.",
+])
+
+CLAUDE_MODEL_ID = "claude-3-7-sonnet-20250219"
+
+# Bound concurrent Claude calls so parallel agents stay within Anthropic's rate limits
+CLAUDE_SEM = asyncio.Semaphore(int(os.getenv("CLAUDE_MAX_CONCURRENCY", "4")))
+# Bound concurrent Exa requests; DuckDuckGo searches run inside agno and are not gated
+EXA_SEM = asyncio.Semaphore(int(os.getenv("EXA_MAX_CONCURRENCY", "8")))
+
+EXA_SEARCH_URL = "https://api.exa.ai/search"
+
+# Exa results shared by every CompetitorSearchTools instance, most recently used last
+EXA_RESULTS: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+EXA_CACHE_SIZE = 1024
+
+# The synthesis call returns the plan as the input of a forced tool call
+STARTUP_PLAN_ADAPTER = TypeAdapter(StartupPlan)
+STARTUP_PLAN_SCHEMA = STARTUP_PLAN_ADAPTER.json_schema()
+STARTUP_PLAN_TOOL = {
+    "name": "submit_startup_plan",
+    "description": "Submit the comprehensive startup plan.",
+    "input_schema": STARTUP_PLAN_SCHEMA,
+}
+WEB_SEARCH_TOOL = {
+    "name": "web_search",
+    "description": "Search the web with DuckDuckGo.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "query": {"type": "string", "description": "The search query."},
+            "max_results": {"type": "integer", "description": "Number of results to return."},
+        },
+        "required": ["query"],
+    },
+}
+EXA_SEARCH_TOOL = {
+    "name": "search_exa",
+    "description": "Search the web with Exa for several queries at once, e.g. one per competitor.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "queries": {"type": "array", "items": {"type": "string"}, "description": "The search queries."},
+        },
+        "required": ["queries"],
+    },
+}
+
+
+class SemanticCache:
+    """SQLite-backed cache of agent reports that also matches near-duplicate prompts.
+
+    Prompts are compared by cosine similarity of their sentence-transformers
+    embeddings. Without sentence-transformers installed only identical prompts hit.
+    Reports older than ``ttl`` seconds are never returned, so research is redone
+    once it may be out of date; ``ttl=None`` keeps reports forever.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = 24 * 60 * 60,
+        threshold: float = 0.87,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+    ):
+        self.ttl = ttl
+        self.threshold = threshold
+        self.model_name = model_name
+        self._model = None
+        self._index: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS reports "
+            "(agent TEXT, prompt TEXT, embedding BLOB, response TEXT, created_at REAL)"
+        )
+
+    def _cutoff(self) -> float:
+        """Return the creation time before which cached reports have expired."""
+        return float("-inf") if self.ttl is None else time.time() - self.ttl
+
+    def _embed(self, prompt: str):
+        if SentenceTransformer is None:
+            return None
+        if self._model is None:
+            self._model = SentenceTransformer(self.model_name)
+        return self._model.encode(prompt, normalize_embeddings=True).astype(np.float32)
+
+    def _load(self, agent: str, dim: int):
+        """Return the (embeddings, responses, created_at) index for an agent, reading it once."""
+        if agent not in self._index:
+            rows = self._db.execute(
+                "SELECT embedding, response, created_at FROM reports "
+                "WHERE agent = ? AND embedding IS NOT NULL",
+                (agent,),
+            ).fetchall()
+            embeddings = np.frombuffer(b"".join(row[0] for row in rows), dtype=np.float32)
+            # An explicit width keeps an agent without embedded rows a valid (0, dim) matrix
+            self._index[agent] = (
+                embeddings.reshape(len(rows), dim),
+                [row[1] for row in rows],
+                np.array([row[2] for row in rows], dtype=np.float64),
+            )
+        return self._index[agent]
+
+    def warmup(self) -> None:
+        """Load the embedding model and every agent's index ahead of the first lookup."""
+        with self._lock:
+            embedding = self._embed("warmup")
+            if embedding is None:
+                return
+            agents = self._db.execute(
+                "SELECT DISTINCT agent FROM reports WHERE embedding IS NOT NULL"
+            ).fetchall()
+            for (agent,) in agents:
+                self._load(agent, embedding.shape[0])
+
+    def lookup(self, agent: str, prompt: str) -> Optional[str]:
+        with self._lock:
+            cutoff = self._cutoff()
+            row = self._db.execute(
+                "SELECT response FROM reports WHERE agent = ? AND prompt = ? AND created_at >= ? "
+                "ORDER BY created_at DESC",
+                (agent, prompt, cutoff),
+            ).fetchone()
+            if row is not None:
+                return row[0]
+            embedding = self._embed(prompt)
+            if embedding is None:
+                return None
+            embeddings, responses, created_at = self._load(agent, embedding.shape[0])
+            if not responses:
+                return None
+            similarities = np.where(created_at >= cutoff, embeddings @ embedding, -np.inf)
+            best = int(similarities.argmax())
+            return responses[best] if similarities[best] >= self.threshold else None
+
+    def store(self, agent: str, prompt: str, response: str) -> None:
+        with self._lock:
+            embedding = self._embed(prompt)
+            created_at = time.time()
+            self._db.execute(
+                "INSERT INTO reports VALUES (?, ?, ?, ?, ?)",
+                (agent, prompt, None if embedding is None else embedding.tobytes(), response, created_at),
+            )
+            self._db.commit()
+            if embedding is not None and agent in self._index:
+                embeddings, responses, created = self._index[agent]
+                self._index[agent] = (
+                    np.vstack([embeddings, embedding]),
+                    responses + [response],
+                    np.append(created, created_at),
+                )
+
+
+@lru_cache(maxsize=1)
+def _config() -> Tuple[str, str]:
+    """Read the API keys once, failing fast if any is missing."""
+    keys = {name: os.getenv(name) for name in ("ANTHROPIC_API_KEY", "EXA_API_KEY")}
+    missing = [name for name, value in keys.items() if not value]
+    if missing:
+        raise ValueError(f"{' and '.join(missing)} not set in the .env file")
+    return keys["ANTHROPIC_API_KEY"], keys["EXA_API_KEY"]
+
+
+@lru_cache(maxsize=1)
+def response_cache() -> Optional[SemanticCache]:
+    """Return the process-wide response cache, or None when ADVISOR_CACHE=0 disables it."""
+    if os.getenv("ADVISOR_CACHE") == "0":
+        return None
+    ttl_hours = float(os.getenv("ADVISOR_CACHE_TTL_HOURS", "24"))
+    return SemanticCache(
+        os.getenv("ADVISOR_CACHE_PATH", ".advisor_cache.sqlite3"),
+        ttl=ttl_hours * 60 * 60 if ttl_hours > 0 else None,
+    )
+
+
+@lru_cache(maxsize=1)
+def http_client() -> httpx.AsyncClient:
+    """Return the pooled HTTP/2 client shared by all outbound API calls."""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        http2=True,
+    )
+
+
+class CompetitorSearchTools(Toolkit):
+    """Exa search toolkit that runs a batch of queries concurrently over the shared HTTP client.
+
+    Create one per agent, since agno binds a toolkit's functions to the agent using
+    it. Results are cached in the module-level ``EXA_RESULTS``, so they are still
+    shared across instances and runs.
+    """
+
+    def __init__(self, api_key: str, num_results: int = 5):
+        super().__init__(name="competitor_search_tools")
+        self.api_key = api_key
+        self.num_results = num_results
+        self.register(self.search_exa)
+
+    async def _search(self, query: str) -> List[Dict[str, Any]]:
+        key = hashlib.md5(json.dumps([query, self.num_results]).encode()).hexdigest()
+        if key in EXA_RESULTS:
+            EXA_RESULTS.move_to_end(key)
+            return EXA_RESULTS[key]
+        async with EXA_SEM:
+            response = await http_client().post(
+                EXA_SEARCH_URL,
+                headers={"x-api-key": self.api_key},
+                json={
+                    "query": query,
+                    "numResults": self.num_results,
+                    "contents": {"text": {"maxCharacters": 1000}},
+                },
+            )
+        response.raise_for_status()
+        results = [
+            {"title": result.get("title"), "url": result.get("url"), "text": result.get("text")}
+            for result in response.json()["results"]
+        ]
+        EXA_RESULTS[key] = results
+        if len(EXA_RESULTS) > EXA_CACHE_SIZE:
+            EXA_RESULTS.popitem(last=False)
+        return results
+
+    async def search_exa(self, queries: List[str]) -> str:
+        """Search the web with Exa for several queries at once.
+
+        Args:
+            queries (List[str]): The search queries, e.g. one per competitor.
+
+        Returns:
+            str: JSON list with one {"query", "results"} object per query, in order.
+        """
+        results = await asyncio.gather(*(self._search(query) for query in queries))
+        return json.dumps([
+            {"query": query, "results": query_results}
+            for query, query_results in zip(queries, results)
+        ])
+
+
+@lru_cache(maxsize=512)
+def web_search(query: str, max_results: int = 5) -> str:
+    """Search DuckDuckGo for single-call mode, memoizing results across runs.
+
+    Single-call mode calls the toolkit method directly, which bypasses the agno
+    function layer where ``cache_results`` applies for the pipeline agents.
+    """
+    return DuckDuckGoTools().duckduckgo_search(query=query, max_results=max_results)
+
+
+@lru_cache(maxsize=1)
+def anthropic_client(api_key: str) -> AsyncAnthropic:
+    """Return the Anthropic client shared by every Claude call, so connections are reused.
+
+    The SDK's own retries are disabled in favour of ``claude_retry``.
+    """
+    return AsyncAnthropic(api_key=api_key, http_client=http_client(), max_retries=0)
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Return whether a failed Claude call is worth retrying."""
+    # agno wraps the Anthropic SDK errors raised inside agent runs
+    if isinstance(exc, ModelProviderError) and exc.__cause__ is not None:
+        exc = exc.__cause__
+    return isinstance(exc, (RateLimitError, APIConnectionError))
+
+
+# Retries wrap the CLAUDE_SEM block, so the slot is released while backing off
+claude_retry = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_random_exponential(multiplier=0.5, max=8),
+    retry=retry_if_exception(_is_transient),
+    reraise=True,
+)
+
+
+def claude_model(client: AsyncAnthropic) -> Claude:
+    """Create a Claude model for an agent that uses the shared Anthropic client.
+
+    Agent system prompts are not marked for prompt caching: with their tool schemas
+    they stay well below Claude's 1024-token minimum for a cacheable prefix, so
+    Anthropic would ignore the breakpoint. The synthesis and single-call prompts
+    are large enough and do set ``cache_control``.
+    """
+    return Claude(id=CLAUDE_MODEL_ID, async_client=client)
+
+
+def build_prompt(business_idea: str, reports: Dict[str, str]) -> str:
+    """Append the reports of upstream agents to the business idea."""
+    sections = [business_idea]
+    sections.extend(report_section(name, report) for name, report in reports.items())
+    return "\n\n".join(sections)
+
+
+def report_section(name: str, report: str) -> str:
+    return f"## {name} report\n\n{report}"
+
+
+def date_note() -> str:
+    return f"Today's date is {date.today().isoformat()}."
+
+
+def with_date(message: str) -> str:
+    """Append today's date to a user message.
+
+    The date lives in the user message rather than the system prompt so system
+    prompts stay byte-identical across runs, and it is added after the response
+    cache lookup so it does not change the cache key.
+    """
+    return f"{message}\n{date_note()}\n"
+
+
+def split_summary(report: str) -> Tuple[str, str]:
+    """Split a report into its opening summary and the full report without the marker."""
+    summary, marker, details = report.partition(SUMMARY_MARKER)
+    if not marker:
+        return report, report
+    return summary.strip(), summary + details.lstrip("\n")
+
+
+@claude_retry
+async def stream_report(
+    agent: Agent,
+    message: str,
+    summary: Optional[asyncio.Future] = None,
+) -> str:
+    """Stream an agent's report, resolving ``summary`` as soon as the summary marker arrives."""
+    chunks: List[str] = []
+    tail = ""
+    async with CLAUDE_SEM:
+        async for event in await agent.arun(with_date(message), stream=True):
+            if event.event not in CONTENT_EVENTS or not isinstance(event.content, str):
+                continue
+            chunks.append(event.content)
+            if summary is not None and not summary.done():
+                # Only the newest text can complete the marker, so avoid rescanning the report
+                tail = tail[-len(SUMMARY_MARKER):] + event.content
+                if SUMMARY_MARKER in tail:
+                    summary.set_result(split_summary("".join(chunks))[0])
+    return "".join(chunks)
+
+
+def cache_namespace(agent: Agent) -> str:
+    """Key an agent's cached reports by its name, model and a hash of its instructions.
+
+    Editing an agent's instructions then misses the cache instead of serving
+    reports written for the old prompt.
+    """
+    prompt = json.dumps([agent.model.id, agent.instructions])
+    return f"{agent.name}:{hashlib.sha256(prompt.encode()).hexdigest()[:16]}"
+
+
+async def run_agent(
+    agent: Agent,
+    message: str,
+    cache: Optional[SemanticCache],
+    summary: Optional[asyncio.Future] = None,
+) -> str:
+    """Run a single agent under the shared concurrency limit and return its report.
+
+    If ``summary`` is given it is resolved with the report's opening summary, which
+    dependent agents can await instead of the whole report.
+    """
+    namespace = cache_namespace(agent)
+    try:
+        report = None if cache is None else await asyncio.to_thread(cache.lookup, namespace, message)
+        if report is None:
+            # Dependents are prompted as soon as the summary resolves, so a retried report
+            # could contradict the summary they used; only retry failures before that point
+            stream = stream_report.retry_with(retry=retry_if_exception(
+                lambda exc: _is_transient(exc) and (summary is None or not summary.done())
+            ))
+            report = await stream(agent, message, summary)
+            if cache is not None:
+                await asyncio.to_thread(cache.store, namespace, message, report)
+    except BaseException:
+        # Never leave dependent agents waiting on a summary that will not arrive. Cancelling
+        # rather than forwarding the error reports the original failure only once.
+        if summary is not None and not summary.done():
+            summary.cancel()
+        raise
+    brief, report = split_summary(report)
+    if summary is not None and not summary.done():
+        summary.set_result(brief)
+    return report
+
+
+@claude_retry
+async def bounded_create(client: AsyncAnthropic, **kwargs: Any):
+    """Create a Claude message without exceeding the shared concurrency limit."""
+    async with CLAUDE_SEM:
+        return await client.messages.create(**kwargs)
+
+
+async def synthesize_plan(client: AsyncAnthropic, reports: Dict[str, str]) -> StartupPlan:
+    """Merge the agents' reports into a StartupPlan with a single Claude call.
+
+    Each report is its own content block rather than being concatenated into one
+    prompt. The first report, the earliest and most stable one, ends the cached prefix.
+    """
+    content: List[Dict[str, Any]] = [{"type": "text", "text": BUSINESS_IDEA}]
+    content.extend({"type": "text", "text": report_section(name, report)} for name, report in reports.items())
+    content[1]["cache_control"] = {"type": "ephemeral"}
+    content.append({"type": "text", "text": date_note()})
+    response = await bounded_create(
+        client,
+        model=CLAUDE_MODEL_ID,
+        max_tokens=8192,
+        system=[{
+            "type": "text",
+            "text": SYNTHESIS_INSTRUCTIONS,
+            "cache_control": {"type": "ephemeral"},
+        }],
+        tools=[STARTUP_PLAN_TOOL],
+        tool_choice={"type": "tool", "name": STARTUP_PLAN_TOOL["name"]},
+        messages=[{"role": "user", "content": content}],
+    )
+    tool_use = next(block for block in response.content if block.type == "tool_use")
+    return STARTUP_PLAN_ADAPTER.validate_python(tool_use.input)
+
+
+async def run_pipeline() -> StartupPlan:
+    # Get API keys up front so a missing key fails before any agent starts
+    anthropic_api_key, exa_api_key = _config()
+
+    # Rich debug output renders on the event loop thread, so only enable it on request
+    verbose = os.getenv("ADVISOR_VERBOSE") == "1"
+
+    client = anthropic_client(anthropic_api_key)
+
+    # Define the agents' tools. Each agent gets its own toolkit because agno rebinds a
+    # toolkit's Function objects to the agent using them, and the concurrent agents must
+    # not share that state. DuckDuckGo's cache_results is a file cache keyed by function
+    # name and arguments and Exa results live in EXA_RESULTS, so cached searches are
+    # still shared across the instances.
     market_research_tools = DuckDuckGoTools(cache_results=True)
-    competitor_analysis_tools = ExaTools(api_key=exa_api_key)
+    competitor_analysis_tools = CompetitorSearchTools(api_key=exa_api_key)
     business_model_tools = DuckDuckGoTools(cache_results=True)
     financial_analysis_tools = DuckDuckGoTools(cache_results=True)
     legal_compliance_tools = DuckDuckGoTools(cache_results=True)
@@ -88,140 +636,205 @@ async def run_team():
     market_research_agent = Agent(
         name="Market Research",
         role="Market Research Specialist",
-        model=Claude("claude-3-7-sonnet-20250219"),
+        model=claude_model(client),
         tools=[market_research_tools],
-        instructions=dedent("""\
-            You are a market research specialist. Your role is to:
-            1. Analyze market size, growth trends, and opportunities for new businesses
-            2. Identify key demographics and customer segments
-            3. Determine market needs and gaps that could be addressed
-            4. Assess barriers to entry and market challenges
-            5. Identify current market trends and future projections
-            
-            Provide comprehensive research about the specified industry or business idea.
-            Always include specific data points and statistics when available.\
-        """),
-        add_datetime_to_instructions=True,
+        instructions=[MARKET_RESEARCH_INSTRUCTIONS, SUMMARY_INSTRUCTIONS],
+        show_tool_calls=verbose,
+        debug_mode=verbose,
     )
 
     competitor_analysis_agent = Agent(
         name="Competitor Analysis",
         role="Competitive Intelligence Analyst",
-        model=Claude("claude-3-7-sonnet-20250219"),
+        model=claude_model(client),
         tools=[competitor_analysis_tools],
-        instructions=dedent("""\
-            You are a competitive intelligence analyst. Your role is to:
-            1. Identify major competitors in the specified market
-            2. Analyze their strengths and weaknesses
-            3. Examine their pricing strategies and market positioning
-            4. Identify their unique selling propositions
-            5. Find potential gaps or weaknesses that a new business could exploit
-            
-            Provide detailed analysis of at least 3-5 key competitors in the space.
-            Include specific examples of their strategies and market positions.\
-        """),
-        add_datetime_to_instructions=True,
+        instructions=[COMPETITOR_ANALYSIS_INSTRUCTIONS, SUMMARY_INSTRUCTIONS],
+        show_tool_calls=verbose,
+        debug_mode=verbose,
     )
 
     business_model_agent = Agent(
         name="Business Model",
         role="Business Model Strategist",
-        model=Claude("claude-3-7-sonnet-20250219"),
+        model=claude_model(client),
         tools=[business_model_tools],
-        instructions=dedent("""\
-            You are a business model strategist. Your role is to:
-            1. Recommend appropriate business models for the proposed venture
-            2. Analyze revenue streams and cost structures
-            3. Define value propositions that would resonate with target customers
-            4. Identify key resources, activities, and partnerships needed
-            5. Evaluate scalability and growth potential
-            
-            Suggest at least 2-3 viable business models for the proposed business.
-            Be specific about how each model would work in practice.\
-        """),
-        add_datetime_to_instructions=True,
+        instructions=[BUSINESS_MODEL_INSTRUCTIONS, SUMMARY_INSTRUCTIONS],
+        show_tool_calls=verbose,
+        debug_mode=verbose,
     )
 
     financial_analysis_agent = Agent(
         name="Financial Analysis",
         role="Financial Analyst",
-        model=Claude("claude-3-7-sonnet-20250219"),
+        model=claude_model(client),
         tools=[financial_analysis_tools],
-        instructions=dedent("""\
-            You are a financial analyst specializing in startups. Your role is to:
-            1. Estimate startup costs and initial capital requirements
-            2. Project monthly operating expenses
-            3. Create revenue projections for the first 1-3 years
-            4. Perform break-even analysis
-            5. Suggest funding options and investment requirements
-            
-            Provide realistic financial projections based on the industry and business model.
-            Include specific costs and revenue figures whenever possible.\
-        """),
-        add_datetime_to_instructions=True,
+        instructions=FINANCIAL_ANALYSIS_INSTRUCTIONS,
+        show_tool_calls=verbose,
+        debug_mode=verbose,
     )
 
     legal_compliance_agent = Agent(
         name="Legal & Compliance",
         role="Legal & Regulatory Advisor",
-        model=Claude("claude-3-7-sonnet-20250219"),
+        model=claude_model(client),
         tools=[legal_compliance_tools],
-        instructions=dedent("""\
-            You are a legal and regulatory advisor for startups. Your role is to:
-            1. Identify key legal requirements for business formation
-            2. Outline necessary licenses and permits
-            3. Highlight industry-specific regulations
-            4. Advise on intellectual property protection
-            5. Point out potential legal risks and compliance issues
-            
-            Provide general legal guidance for the proposed business.
-            Note that your advice is informational and entrepreneurs should 
-            consult with a qualified attorney for specific legal questions.\
-        """),
-        add_datetime_to_instructions=True,
+        instructions=LEGAL_COMPLIANCE_INSTRUCTIONS,
+        show_tool_calls=verbose,
+        debug_mode=verbose,
     )
 
-    # Create and run the team
-    team = Team(
-        name="Business Startup Advisor",
-        mode="coordinate",
-        model=Claude("claude-3-7-sonnet-20250219"),
-        members=[
-            market_research_agent,
-            competitor_analysis_agent,
-            business_model_agent,
-            financial_analysis_agent,
-            legal_compliance_agent,
-        ],
-        instructions=[
-            "First, understand the business idea and industry thoroughly.",
-            "Have the Market Research agent analyze the market size, trends, and opportunities.",
-            "Then, have the Competitor Analysis agent identify and analyze key competitors.",
-            "Next, have the Business Model agent recommend viable business models based on the market and competitive landscape.",
-            "Have the Financial Analysis agent create realistic financial projections based on the business models.",
-            "Have the Legal & Compliance agent identify key legal requirements and regulatory considerations.",
-            "Finally, synthesize all information into a comprehensive startup plan with specific, actionable advice.",
-            "Continue asking individual team members until you have ALL the information you need.",
-        ],
-        response_model=StartupPlan,
-        show_tool_calls=True,
-        markdown=True,
-        debug_mode=True,
-        show_members_responses=True,
-        add_datetime_to_instructions=True,
+    # Reuse reports from earlier runs on the same or a paraphrased idea
+    cache = response_cache()
+
+    loop = asyncio.get_running_loop()
+    market_summary, competitor_summary, business_model_summary = (
+        loop.create_future() for _ in range(3)
     )
 
-    # Execute the team's task with the user's business idea
-    await team.aprint_response(
-        dedent("""\
-        I'm thinking of starting a subscription-based meal preparation service that 
-        focuses on sustainable, locally-sourced ingredients and targets busy professionals.
-        The service would deliver pre-portioned ingredients and recipes weekly.
-        I'm planning to launch in Austin, Texas first, then expand to other cities.
-        What should I know before starting this business? What are my chances of success?
-        """)
+    async def run_business_model() -> str:
+        # The business model builds on the market and competitive landscape
+        message = build_prompt(BUSINESS_IDEA, {
+            "Market Research summary": await market_summary,
+            "Competitor Analysis summary": await competitor_summary,
+        })
+        return await run_agent(business_model_agent, message, cache, business_model_summary)
+
+    async def run_financial_analysis() -> str:
+        # The financial projections build on the recommended business models
+        message = build_prompt(BUSINESS_IDEA, {
+            "Business Model summary": await business_model_summary,
+        })
+        return await run_agent(financial_analysis_agent, message, cache)
+
+    # Market research, competitor analysis and legal review only need the idea itself;
+    # dependent agents start as soon as the summaries they need have streamed in.
+    # If any agent fails, the task group cancels the others so no tokens are wasted.
+    async with asyncio.TaskGroup() as tg:
+        market_task = tg.create_task(
+            run_agent(market_research_agent, BUSINESS_IDEA, cache, market_summary)
+        )
+        competitor_task = tg.create_task(
+            run_agent(competitor_analysis_agent, BUSINESS_IDEA, cache, competitor_summary)
+        )
+        legal_task = tg.create_task(run_agent(legal_compliance_agent, BUSINESS_IDEA, cache))
+        business_model_task = tg.create_task(run_business_model())
+        financial_task = tg.create_task(run_financial_analysis())
+
+    # A single Claude call merges the reports; no coordinator turns are needed
+    return await synthesize_plan(
+        client,
+        {
+            "Market Research": market_task.result(),
+            "Competitor Analysis": competitor_task.result(),
+            "Business Model": business_model_task.result(),
+            "Financial Analysis": financial_task.result(),
+            "Legal & Compliance": legal_task.result(),
+        },
     )
 
 
+async def run_single_call(max_turns: int = 10) -> StartupPlan:
+    """Research and plan the business in one Claude conversation instead of five agents.
+
+    All specialist instructions share one cached system prompt. Claude calls the
+    search tools until it submits the plan, which is forced on the last turn.
+    """
+    anthropic_api_key, exa_api_key = _config()
+    client = anthropic_client(anthropic_api_key)
+    competitor_analysis_tools = CompetitorSearchTools(api_key=exa_api_key)
+
+    def tool_error(tool_use: Any, exc: Exception) -> Dict[str, Any]:
+        # Report the failure to Claude, as agno does for the pipeline agents
+        return {
+            "type": "tool_result",
+            "tool_use_id": tool_use.id,
+            "content": f"{type(exc).__name__}: {exc}",
+            "is_error": True,
+        }
+
+    async def call_tool(tool_use: Any) -> Dict[str, Any]:
+        try:
+            if tool_use.name == EXA_SEARCH_TOOL["name"]:
+                content = await competitor_analysis_tools.search_exa(**tool_use.input)
+            elif tool_use.name == WEB_SEARCH_TOOL["name"]:
+                content = await asyncio.to_thread(web_search, **tool_use.input)
+            else:
+                raise ValueError(f"Unknown tool {tool_use.name!r}")
+        except Exception as exc:
+            return tool_error(tool_use, exc)
+        return {"type": "tool_result", "tool_use_id": tool_use.id, "content": content}
+
+    messages: List[Dict[str, Any]] = [{"role": "user", "content": with_date(BUSINESS_IDEA)}]
+    for turn in range(max_turns):
+        last_turn = turn == max_turns - 1
+        response = await bounded_create(
+            client,
+            model=CLAUDE_MODEL_ID,
+            max_tokens=8192,
+            system=[{
+                "type": "text",
+                "text": SINGLE_CALL_INSTRUCTIONS,
+                "cache_control": {"type": "ephemeral"},
+            }],
+            tools=[WEB_SEARCH_TOOL, EXA_SEARCH_TOOL, STARTUP_PLAN_TOOL],
+            tool_choice=(
+                {"type": "tool", "name": STARTUP_PLAN_TOOL["name"]} if last_turn else {"type": "any"}
+            ),
+            messages=messages,
+        )
+        tool_uses = [block for block in response.content if block.type == "tool_use"]
+        if not tool_uses:
+            # tool_choice forces a tool call, so this only happens when the turn was cut short
+            raise RuntimeError(f"Claude stopped without calling a tool (stop_reason={response.stop_reason!r})")
+        results: List[Dict[str, Any]] = []
+        searches = []
+        for tool_use in tool_uses:
+            if tool_use.name != STARTUP_PLAN_TOOL["name"]:
+                searches.append(tool_use)
+                continue
+            try:
+                return STARTUP_PLAN_ADAPTER.validate_python(tool_use.input)
+            except ValidationError as exc:
+                if last_turn:
+                    raise
+                # Let Claude correct the plan on the next turn
+                results.append(tool_error(tool_use, exc))
+        results.extend(await asyncio.gather(*(call_tool(tool_use) for tool_use in searches)))
+        messages.append({"role": "assistant", "content": response.content})
+        messages.append({"role": "user", "content": results})
+    raise RuntimeError("Claude did not submit a startup plan")
+
+
+async def warmup(load_cache: bool = True) -> None:
+    """Pay one-time startup costs before the first request arrives.
+
+    Opens TLS connections to Anthropic and Exa in the shared HTTP client's pool and,
+    unless ``load_cache`` is false, loads the embedding model and cached reports.
+    Call it from an ASGI lifespan handler, or before the first run on the same
+    event loop.
+    """
+    async def connect(url: str) -> None:
+        try:
+            await http_client().head(url)
+        except httpx.HTTPError:
+            pass  # Warming is best effort; the real request reports connection errors
+
+    tasks = [connect("https://api.anthropic.com"), connect(EXA_SEARCH_URL)]
+    cache = response_cache()
+    if load_cache and cache is not None:
+        tasks.append(asyncio.to_thread(cache.warmup))
+    await asyncio.gather(*tasks)
+
+
+async def main() -> None:
+    # Fail on missing API keys before warmup spends time on connections and the cache
+    _config()
+    single_call = os.getenv("ADVISOR_MODE") == "single"
+    # Single-call mode shares the pooled connections but never reads the response cache
+    await warmup(load_cache=not single_call)
+    plan = await (run_single_call() if single_call else run_pipeline())
+    print(plan.model_dump_json(indent=2))
+
+
 if __name__ == "__main__":
-    asyncio.run(run_team())
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
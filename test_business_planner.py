@@ -0,0 +1,381 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from tenacity import wait_none
+
+np = pytest.importorskip("numpy")
+business_planner = pytest.importorskip("business_planner")
+
+
+class StubEncoder:
+    """Stands in for SentenceTransformer; prompts of similar length embed close together."""
+
+    def __init__(self, model_name):
+        pass
+
+    def encode(self, prompt, normalize_embeddings=False):
+        vector = np.array([len(prompt), 1.0], dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+
+@pytest.fixture
+def with_embeddings(monkeypatch):
+    monkeypatch.setattr(business_planner, "SentenceTransformer", StubEncoder)
+
+
+def test_lookup_misses_on_empty_cache(with_embeddings, cache_path):
+    cache = business_planner.SemanticCache(cache_path)
+    assert cache.lookup("Market Research", "idea") is None
+
+
+def test_store_after_empty_lookup_is_found_again(with_embeddings, cache_path):
+    cache = business_planner.SemanticCache(cache_path)
+    assert cache.lookup("Market Research", "idea") is None
+    cache.store("Market Research", "idea", "report")
+    assert cache.lookup("Market Research", "idea!") == "report"
+
+
+def test_warmup_skips_rows_stored_without_embeddings(monkeypatch, cache_path):
+    monkeypatch.setattr(business_planner, "SentenceTransformer", None)
+    business_planner.SemanticCache(cache_path).store("Legal & Compliance", "idea", "report")
+
+    monkeypatch.setattr(business_planner, "SentenceTransformer", StubEncoder)
+    cache = business_planner.SemanticCache(cache_path)
+    cache.warmup()
+    assert cache.lookup("Legal & Compliance", "idea") == "report"
+    assert cache.lookup("Legal & Compliance", "other idea") is None
+
+
+def test_cache_namespace_changes_with_instructions():
+    def agent(instructions):
+        return business_planner.Agent(
+            name="Market Research",
+            model=business_planner.claude_model(None),
+            instructions=instructions,
+        )
+
+    original = business_planner.cache_namespace(agent(business_planner.MARKET_RESEARCH_INSTRUCTIONS))
+    edited = business_planner.cache_namespace(
+        agent([business_planner.MARKET_RESEARCH_INSTRUCTIONS, business_planner.SUMMARY_INSTRUCTIONS])
+    )
+    assert original.startswith("Market Research:")
+    assert original != edited
+
+
+@pytest.mark.parametrize("embedded", [False, True])
+def test_lookup_ignores_expired_reports(monkeypatch, cache_path, embedded):
+    monkeypatch.setattr(business_planner, "SentenceTransformer", StubEncoder if embedded else None)
+    cache = business_planner.SemanticCache(cache_path, ttl=60)
+    cache.store("Market Research", "idea", "report")
+    assert cache.lookup("Market Research", "idea") == "report"
+
+    now = business_planner.time.time()
+    monkeypatch.setattr(business_planner.time, "time", lambda: now + 61)
+    assert cache.lookup("Market Research", "idea") is None
+    assert cache.lookup("Market Research", "idea!") is None
+
+
+def test_response_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("ADVISOR_CACHE", "0")
+    assert business_planner.response_cache.__wrapped__() is None
+
+
+class StubAgent:
+    """Stands in for an agno Agent, streaming the text chunks its script yields."""
+
+    def __init__(self, script, **kwargs):
+        self.__dict__.update(kwargs)
+        self.script = script
+        self.messages = []
+
+    async def arun(self, message, stream=False):
+        self.messages.append(message)
+        return self._events()
+
+    async def _events(self):
+        async for chunk in self.script(self):
+            yield SimpleNamespace(event="RunResponseContent", content=chunk)
+
+
+@pytest.fixture
+def stub_pipeline(monkeypatch):
+    """Run the pipeline with StubAgents, returning the reports handed to synthesis."""
+    scripts, agents = {}, {}
+
+    def agent(**kwargs):
+        agents[kwargs["name"]] = StubAgent(scripts[kwargs["name"]], **kwargs)
+        return agents[kwargs["name"]]
+
+    async def synthesize_plan(client, reports):
+        return reports
+
+    monkeypatch.setattr(business_planner, "Agent", agent)
+    monkeypatch.setattr(business_planner, "_config", lambda: ("anthropic-key", "exa-key"))
+    monkeypatch.setattr(business_planner, "anthropic_client", lambda api_key: None)
+    monkeypatch.setattr(business_planner, "response_cache", lambda: None)
+    monkeypatch.setattr(business_planner, "synthesize_plan", synthesize_plan)
+
+    def run(**agent_scripts):
+        scripts.update(agent_scripts)
+        return asyncio.run(asyncio.wait_for(business_planner.run_pipeline(), timeout=5))
+
+    run.agents = agents
+    return run
+
+
+MARKER = business_planner.SUMMARY_MARKER
+
+
+async def leaf_report(agent):
+    yield f"{agent.name} report."
+
+
+def test_summary_resolves_when_marker_spans_chunks():
+    resolved_mid_stream = []
+
+    async def run():
+        summary = asyncio.get_running_loop().create_future()
+
+        async def script(agent):
+            yield "Short summary.\n" + MARKER[:5]
+            yield MARKER[5:] + "\n"
+            resolved_mid_stream.append(summary.done())
+            yield "Full details."
+
+        report = await business_planner.stream_report(StubAgent(script), "idea", summary)
+        return summary.result(), report
+
+    brief, report = asyncio.run(run())
+    assert resolved_mid_stream == [True]
+    assert brief == "Short summary."
+    assert report == f"Short summary.\n{MARKER}\nFull details."
+
+
+def test_split_summary_without_marker_uses_whole_report():
+    assert business_planner.split_summary("Only a report.") == ("Only a report.", "Only a report.")
+
+    async def run():
+        summary = asyncio.get_running_loop().create_future()
+        agent = StubAgent(
+            leaf_report, name="Legal & Compliance", model=SimpleNamespace(id="claude"), instructions=[]
+        )
+        report = await business_planner.run_agent(agent, "idea", None, summary)
+        return summary.result(), report
+
+    assert asyncio.run(run()) == ("Legal & Compliance report.", "Legal & Compliance report.")
+
+
+def test_dependents_start_on_upstream_summaries(stub_pipeline):
+    business_model_started = asyncio.Event()
+
+    async def upstream(agent):
+        yield f"{agent.name} summary.\n{MARKER}\n"
+        # Holding back the rest of the report deadlocks unless dependents start on the summary
+        await business_model_started.wait()
+        yield f"{agent.name} details."
+
+    async def business_model(agent):
+        business_model_started.set()
+        yield f"Business Model summary.\n{MARKER}\nBusiness Model details."
+
+    reports = stub_pipeline(**{
+        "Market Research": upstream,
+        "Competitor Analysis": upstream,
+        "Business Model": business_model,
+        "Financial Analysis": leaf_report,
+        "Legal & Compliance": leaf_report,
+    })
+
+    assert reports["Market Research"] == "Market Research summary.\nMarket Research details."
+    assert reports["Business Model"] == "Business Model summary.\nBusiness Model details."
+    assert reports["Financial Analysis"] == "Financial Analysis report."
+    prompt = stub_pipeline.agents["Business Model"].messages[0]
+    assert "Market Research summary." in prompt and "Competitor Analysis summary." in prompt
+    assert "details" not in prompt
+    assert "Business Model summary." in stub_pipeline.agents["Financial Analysis"].messages[0]
+
+
+@pytest.mark.parametrize("after_summary", [False, True])
+def test_failed_agent_is_reported_once(stub_pipeline, after_summary):
+    error = ValueError("market research failed")
+    business_model_started = asyncio.Event()
+
+    async def failing(agent):
+        if after_summary:
+            yield f"Market Research summary.\n{MARKER}\n"
+            await business_model_started.wait()
+        raise error
+        yield
+
+    async def upstream(agent):
+        yield f"{agent.name} summary.\n{MARKER}\n"
+        await business_model_started.wait()
+        yield f"{agent.name} details."
+
+    async def business_model(agent):
+        business_model_started.set()
+        yield "Business Model summary."
+        await asyncio.Event().wait()
+
+    with pytest.raises(ExceptionGroup) as excinfo:
+        stub_pipeline(**{
+            "Market Research": failing,
+            "Competitor Analysis": upstream,
+            "Business Model": business_model,
+            "Financial Analysis": leaf_report,
+            "Legal & Compliance": leaf_report,
+        })
+
+    # Dependents waiting on the failed agent's summary are cancelled, not failed with a copy
+    assert excinfo.value.exceptions == (error,)
+    assert bool(stub_pipeline.agents["Business Model"].messages) == after_summary
+
+
+@pytest.mark.parametrize("after_summary", [False, True])
+def test_rate_limited_stream_is_retried_only_before_summary(monkeypatch, after_summary):
+    anthropic = pytest.importorskip("anthropic")
+    httpx = pytest.importorskip("httpx")
+    exceptions = pytest.importorskip("agno.exceptions")
+    monkeypatch.setattr(business_planner.stream_report.retry, "wait", wait_none())
+
+    async def rate_limited_once(agent):
+        if after_summary:
+            yield f"Summary.\n{MARKER}\n"
+        if len(agent.messages) == 1:
+            # agno wraps the SDK error, as Claude does for rate limits inside agent runs
+            response = httpx.Response(429, request=httpx.Request("POST", "https://api.anthropic.com"))
+            cause = anthropic.RateLimitError("rate limited", response=response, body=None)
+            wrapper = getattr(exceptions, "ModelRateLimitError", exceptions.ModelProviderError)
+            raise wrapper("rate limited") from cause
+        yield f"Summary.\n{MARKER}\nDetails."
+
+    agent = StubAgent(
+        rate_limited_once, name="Market Research", model=SimpleNamespace(id="claude"), instructions=[]
+    )
+
+    async def run():
+        summary = asyncio.get_running_loop().create_future()
+        return await business_planner.run_agent(agent, "idea", None, summary)
+
+    if after_summary:
+        with pytest.raises(exceptions.ModelProviderError):
+            asyncio.run(run())
+        assert len(agent.messages) == 1
+    else:
+        assert asyncio.run(run()) == "Summary.\nDetails."
+        assert len(agent.messages) == 2
+
+
+def test_exa_results_keep_duplicate_queries_and_are_shared(monkeypatch):
+    posted = []
+
+    class StubClient:
+        async def post(self, url, headers, json):
+            query = json["query"]
+            posted.append(query)
+            return SimpleNamespace(
+                raise_for_status=lambda: None,
+                json=lambda: {"results": [{"title": query, "url": "u", "text": "t"}]},
+            )
+
+    monkeypatch.setattr(business_planner, "http_client", StubClient)
+    monkeypatch.setattr(business_planner, "EXA_RESULTS", business_planner.OrderedDict())
+
+    first = business_planner.CompetitorSearchTools(api_key="exa-key")
+    results = json.loads(asyncio.run(first.search_exa(["acme", "acme", "globex"])))
+    assert [entry["query"] for entry in results] == ["acme", "acme", "globex"]
+    assert results[0] == results[1]
+
+    second = business_planner.CompetitorSearchTools(api_key="exa-key")
+    asyncio.run(second.search_exa(["globex"]))
+    assert posted.count("globex") == 1
+
+
+PLAN = {
+    "industry": "Food",
+    "market_analysis": {
+        "market_size": "$1B", "growth_rate": "5%", "key_trends": [], "target_demographics": [],
+        "barriers_to_entry": [], "opportunities": [],
+    },
+    "competitors": [],
+    "recommended_business_models": [],
+    "financial_projections": {
+        "startup_costs": {}, "monthly_operating_costs": {}, "revenue_projections": {},
+        "break_even_analysis": "Year two", "funding_requirements": None, "potential_roi": None,
+    },
+    "next_steps": [],
+}
+
+
+def tool_use(id, name, input):
+    return SimpleNamespace(type="tool_use", id=id, name=name, input=input)
+
+
+@pytest.fixture
+def stub_claude(monkeypatch):
+    """Script single-call mode's Claude turns, recording the messages of each request."""
+    turns, requests = [], []
+
+    class Messages:
+        async def create(self, **kwargs):
+            requests.append(list(kwargs["messages"]))
+            return turns.pop(0)
+
+    monkeypatch.setattr(business_planner, "_config", lambda: ("anthropic-key", "exa-key"))
+    client = SimpleNamespace(messages=Messages())
+    monkeypatch.setattr(business_planner, "anthropic_client", lambda api_key: client)
+    monkeypatch.setattr(business_planner, "web_search", lambda query, max_results=5: f"results for {query}")
+
+    def run(*scripted_turns):
+        turns.extend(scripted_turns)
+        return asyncio.run(business_planner.run_single_call())
+
+    run.requests = requests
+    return run
+
+
+def test_single_call_returns_tool_errors_to_claude(stub_claude):
+    plan = stub_claude(
+        SimpleNamespace(stop_reason="tool_use", content=[
+            tool_use("unknown", "read_file", {"path": "/etc/passwd"}),
+            tool_use("invalid", "submit_startup_plan", {"industry": "Food"}),
+            tool_use("search", "web_search", {"query": "food trucks"}),
+        ]),
+        SimpleNamespace(stop_reason="tool_use", content=[tool_use("plan", "submit_startup_plan", PLAN)]),
+    )
+
+    assert plan.industry == "Food"
+    results = {result["tool_use_id"]: result for result in stub_claude.requests[1][-1]["content"]}
+    assert results["unknown"]["is_error"] and "read_file" in results["unknown"]["content"]
+    assert results["invalid"]["is_error"] and "ValidationError" in results["invalid"]["content"]
+    assert results["search"] == {
+        "type": "tool_result", "tool_use_id": "search", "content": "results for food trucks",
+    }
+
+
+def test_single_call_fails_on_turn_without_tool_use(stub_claude):
+    truncated = SimpleNamespace(stop_reason="max_tokens", content=[SimpleNamespace(type="text", text="Plan")])
+    with pytest.raises(RuntimeError, match="max_tokens"):
+        stub_claude(truncated)
+
+
+def test_main_checks_api_keys_before_warmup(monkeypatch):
+    warmed = []
+
+    async def warmup(load_cache=True):
+        warmed.append(load_cache)
+
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    monkeypatch.delenv("EXA_API_KEY", raising=False)
+    monkeypatch.setattr(business_planner, "_config", business_planner._config.__wrapped__)
+    monkeypatch.setattr(business_planner, "warmup", warmup)
+    with pytest.raises(ValueError, match="ANTHROPIC_API_KEY and EXA_API_KEY"):
+        asyncio.run(business_planner.main())
+    assert warmed == []